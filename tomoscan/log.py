@@ -2,7 +2,10 @@
     tomoscan custom logger
     
 '''
+import atexit
 import logging
+import logging.handlers
+import queue
 
 logger = logging.getLogger(__name__)
 
@@ -20,18 +23,40 @@ def debug(msg, *args, **kwargs):
 
 def setup_custom_logger(lfname=None, stream_to_console=True):
 
+    # Only add the handlers once, otherwise every record is written again for each call
+    if logger.handlers:
+        return
+
     logger.setLevel(logging.DEBUG)
 
+    handlers = []
     if (lfname != None):
-        fHandler = logging.FileHandler(lfname)
+        fHandler = logging.FileHandler(lfname, delay=True)
         file_formatter = logging.Formatter('%(asctime)s - %(levelname)s: %(message)s')
         fHandler.setFormatter(file_formatter)
-        logger.addHandler(fHandler)
+        handlers.append(fHandler)
     if stream_to_console:
         ch = logging.StreamHandler()
         ch.setFormatter(ColoredLogFormatter('%(asctime)s - %(message)s'))
         ch.setLevel(logging.DEBUG)
-        logger.addHandler(ch)
+        handlers.append(ch)
+    if not handlers:
+        return
+
+    # The handlers run in a background thread so that logging calls do not wait for file or console I/O
+    log_queue = queue.Queue()
+    logger.addHandler(_RawQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Write out the queued records before the interpreter exits
+    atexit.register(listener.stop)
+
+class _RawQueueHandler(logging.handlers.QueueHandler):
+    # QueueHandler.prepare() formats the message on the calling thread; the queue is only
+    # read by the listener in this process, so pass the record through and let the
+    # handlers format it on the listener thread
+    def prepare(self, record):
+        return record
 
 class ColoredLogFormatter(logging.Formatter):
     def __init__(self, fmt, datefmt=None, style='%'):
@@ -14,7 +14,7 @@ import sys
 import os
 from datetime import timedelta
 import pymsgbox
-from epics import PV
+from epics import PV, caput_many
 from tomoscan import log
 
 class ScanAbortError(Exception):
@@ -550,9 +550,11 @@ class TomoScan():
         self.epics_pvs['CamAcquire'].put(0, wait=True)
         # Set the exposure time
         self.set_exposure_time()
-        # Set the file path, file name and file number
-        self.epics_pvs['FPFilePath'].put(self.epics_pvs['FilePath'].value, wait=True)
-        self.epics_pvs['FPFileName'].put(self.epics_pvs['FileName'].value, wait=True) 
+        # Set the file path, file name and file number.
+        # These puts are independent, so issue both and then wait for both to complete
+        caput_many([self.epics_pvs['FPFilePath'].pvname, self.epics_pvs['FPFileName'].pvname],
+                   [self.epics_pvs['FilePath'].value, self.epics_pvs['FileName'].value],
+                   wait='all', put_timeout=30.0)
 
         # Copy the current values of scan parameters into class variables
         self.exposure_time        = self.epics_pvs['ExposureTime'].value
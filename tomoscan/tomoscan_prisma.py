@@ -8,26 +8,23 @@ A single tomography measurement consists of the following steps:
     Collect post scan
 
 """
-import copy
-from epics import PV
+from epics import PV, ca, caget_many, caput_many
 import numpy as np
 import time
+import threading
 from tomoscan import log
 from tomoscan import TomoScan
 from tomoscan import TomoScanSTEP
+from tomoscan.tomoscan import ScanAbortError, CameraTimeoutError, FileOverwriteError
 
-class ScanAbortError(Exception):
-    '''Exception raised when user wants to abort a scan.
-    '''
+# Number of times dark or flat fields are collected for each DarkFieldMode/FlatFieldMode
+_FIELD_MODE_COUNT = {'Start': 1, 'End': 1, 'Both': 2, 'None': 0}
 
+# Andor readout time in s for each AndorADCSpeed index (5 MHz, 3 MHz, 1 MHz, 0.08 MHz)
+_ANDOR_READOUT = (1/0.953, 1/0.607, 1/0.221, 1/0.011)
 
-class CameraTimeoutError(Exception):
-    '''Exception raised when the camera times out during a scan.
-    '''
-
-class FileOverwriteError(Exception):
-    '''Exception raised when a file would be overwritten.
-    '''
+# Extra time in s allowed for a rotation move on top of its expected duration
+_ROTATION_TIMEOUT_SLACK = 5.0
 
 
 class TomoScanPrisma(TomoScanSTEP):
@@ -48,12 +45,97 @@ class TomoScanPrisma(TomoScanSTEP):
         log.setup_custom_logger(lfname='./TomoScanLog', stream_to_console=True)
         #get camera manufacturer
         self.manufacturer = self.control_pvs['CamManufacturer'].get(as_string=True)
+        self._is_andor = 'Andor' in self.manufacturer
+        self._is_teledyne = 'Teledyne DALSA' in self.manufacturer
+        # The camera does not change, so select the frame time computation once
+        if self._is_andor:
+            self.compute_frame_time = self._compute_frame_time_andor
+        elif self._is_teledyne:
+            self.compute_frame_time = self._compute_frame_time_teledyne
+        else:
+            self.compute_frame_time = self._compute_frame_time_default
         prefix = self.pv_prefixes['Camera']
         self.camera_prefix = prefix + 'cam1:'
-        self.frametype = PV(self.camera_prefix + 'FrameType')
+        # FrameType is only written and the ADC speed is read once per scan, so neither needs a monitor
+        self.frametype = PV(self.camera_prefix + 'FrameType', auto_monitor=False)
         #if camera is Andor, grab ADC speed
-        if (self.manufacturer.find('Andor') != -1):
-            self.control_pvs['CamADCSpeed'] = PV(self.camera_prefix + 'AndorADCSpeed_RBV')
+        if self._is_andor:
+            self.control_pvs['CamADCSpeed'] = PV(self.camera_prefix + 'AndorADCSpeed_RBV', auto_monitor=False)
+        # Keep references to the PVs used on every scan to avoid repeated dictionary lookups
+        self._pv_rotation = self.epics_pvs['Rotation']
+        # Rotation motor readback and retry deadband, used to detect when the stage has settled
+        self.control_pvs['RotationRBV'] = PV(self._pv_rotation.pvname + '.RBV')
+        self.control_pvs['RotationRetryDeadband'] = PV(self._pv_rotation.pvname + '.RDBD')
+        # Backlash and settling delay of the rotation motor, used to compute the move timeout
+        self.control_pvs['RotationBacklashDistance'] = PV(self._pv_rotation.pvname + '.BDST')
+        self.control_pvs['RotationBacklashSpeed'] = PV(self._pv_rotation.pvname + '.BVEL')
+        self.control_pvs['RotationBacklashAccelTime'] = PV(self._pv_rotation.pvname + '.BACC')
+        self.control_pvs['RotationSettleDelay'] = PV(self._pv_rotation.pvname + '.DLY')
+        self._pv_rotation_rbv = self.control_pvs['RotationRBV']
+        self._pv_rotation_end = self.epics_pvs['RotationEnd']
+        self._pv_post_scan_mode = self.epics_pvs['AcquirePostScan']
+        self._pv_post_scan_step = self.epics_pvs['PostScanStep']
+        self._pv_stabilization_time = self.epics_pvs['StabilizationTime']
+        self._pv_cam_acquire = self.epics_pvs['CamAcquire']
+        self._pv_fp_num_capture = self.epics_pvs['FPNumCapture']
+        self._pv_fp_capture = self.epics_pvs['FPCapture']
+        # Raw CA channels for the puts made on every angle, which skip the PV object overhead
+        self._rotation_chid = ca.create_channel(self._pv_rotation.pvname, connect=True)
+        self._acquire_chid = ca.create_channel(self._pv_cam_acquire.pvname, connect=True)
+        # FrameType and ImageMode are written together with caput_many() in set_frame_type()
+        self._frametype_pvname = self.frametype.pvname
+        self._image_mode_pvname = self.control_pvs['CamImageMode'].pvname
+        # TriggerMode and NumImages are written together with caput_many() in set_trigger_mode()
+        self._trigger_mode_pvname = self.epics_pvs['CamTriggerMode'].pvname
+        self._num_images_pvname = self.epics_pvs['CamNumImages'].pvname
+        # Scan parameters read with a single caget_many() in begin_scan()
+        self._scan_pvnames = [self._pv_rotation_end.pvname,
+                              self._pv_post_scan_mode.pvname,
+                              self._pv_post_scan_step.pvname,
+                              self._pv_stabilization_time.pvname,
+                              self.epics_pvs['StabilizationSettleTime'].pvname,
+                              self.epics_pvs['RotationSpeed'].pvname,
+                              self.epics_pvs['RotationAccelTime'].pvname,
+                              self.control_pvs['RotationRetryDeadband'].pvname,
+                              self.control_pvs['RotationBacklashDistance'].pvname,
+                              self.control_pvs['RotationBacklashSpeed'].pvname,
+                              self.control_pvs['RotationBacklashAccelTime'].pvname,
+                              self.control_pvs['RotationSettleDelay'].pvname]
+        # Set in begin_scan() so that the values are read once per scan
+        self.stabilization_time = None
+        self.stabilization_settle_time = None
+        self._adc_idx = None
+        self._rotation_speed = None
+        self._rotation_accel_time = None
+        self._rotation_deadband = None
+        self._rotation_backlash = None
+        self._rotation_backlash_speed = None
+        self._rotation_backlash_accel_time = None
+        self._rotation_settle_delay = None
+        # Last camera modes written during the current scan, used to skip redundant puts
+        self._image_mode_current = None
+        self._trigger_mode_current = None
+        self._frame_type_current = None
+        # Completion of the rotation moves started by _start_rotation()
+        self._rotation_done = threading.Event()
+        self._rotation_done_time = None
+        self._rotation_timeout = None
+        # Incremented for each move and passed as the put callback data, so that a late
+        # callback from an earlier move is not taken as completion of the current one
+        self._rotation_move_id = 0
+        # Updated by a monitor on the rotation readback while a move is in progress
+        self._rotation_target = None
+        self._rotation_in_deadband = False
+        self._rotation_rbv_time = None
+        self._rotation_rbv_changed = threading.Event()
+        self._pv_rotation_rbv.add_callback(self._rotation_rbv_callback)
+        # Signalled by a monitor on the camera Acquire PV when an acquisition completes
+        self._acquire_done = threading.Event()
+        self._pv_cam_acquire.add_callback(self._acquire_callback)
+        # Signalled by a monitor on the file plugin NumCaptured_RBV PV when the projections are saved
+        self._all_saved = threading.Event()
+        self._num_saved_target = None
+        self.epics_pvs['FPNumCaptured'].add_callback(self._num_captured_callback)
 
     def begin_scan(self):
         """
@@ -65,28 +147,65 @@ class TomoScanPrisma(TomoScanSTEP):
 
         """
         TomoScan.begin_scan(self)
-        self.rotation_stop = self.epics_pvs['RotationEnd'].value
-        self.num_angles = int(((self.rotation_stop-self.rotation_start)/self.rotation_step)+1)
-        self.post_scan_mode = self.epics_pvs['AcquirePostScan'].get(as_string=True)
-        self.post_scan_step = self.epics_pvs['PostScanStep'].value
-        self.num_post_scan = int(((self.rotation_stop-self.rotation_start)/self.post_scan_step)+1)
-        self.theta = self.rotation_start + np.arange(self.num_angles) * self.rotation_step
+        # The camera modes may have been changed since the last scan
+        self._image_mode_current = None
+        self._trigger_mode_current = None
+        self._frame_type_current = None
+        values = caget_many(self._scan_pvnames, timeout=1.0)
+        # caget_many() returns None for any PV that could not be read
+        missing = [pvname for pvname, value in zip(self._scan_pvnames, values) if value is None]
+        if missing:
+            for pvname in missing:
+                log.error('could not read PV %s', pvname)
+            self.abort_scan()
+            raise ScanAbortError
+        (self.rotation_stop, post_scan_mode,
+         self.post_scan_step, self.stabilization_time,
+         self.stabilization_settle_time, self._rotation_speed, self._rotation_accel_time,
+         self._rotation_deadband, self._rotation_backlash,
+         self._rotation_backlash_speed, self._rotation_backlash_accel_time,
+         self._rotation_settle_delay) = values
+        self.post_scan_mode = self._pv_post_scan_mode.enum_strs[post_scan_mode]
+        if 'CamADCSpeed' in self.control_pvs:
+            self._adc_idx = self.control_pvs['CamADCSpeed'].get()
+        # Angles for the projections and for the post scan
+        self.num_angles, self.theta_main = self.compute_angles(self.rotation_step)
+        self.num_post_scan, self.theta_post = self.compute_angles(self.post_scan_step)
+        self.theta = self.theta_main
         
-        self.total_images = self.num_angles
-        if self.dark_field_mode != 'None':
-            self.total_images += self.num_dark_fields
-        if self.dark_field_mode == 'Both':
-            self.total_images += self.num_dark_fields
-        if self.flat_field_mode != 'None':
-            self.total_images += self.num_flat_fields
-        if self.flat_field_mode == 'Both':
-            self.total_images += self.num_flat_fields
-        if self.post_scan_mode == "Yes":
-            self.total_images +=self.num_post_scan
-        print(self.total_images)
-        self.epics_pvs['FPNumCapture'].put(self.total_images, wait=True)
-        self.epics_pvs['FPCapture'].put('Capture')
+        self.total_images = (self.num_angles
+                             + _FIELD_MODE_COUNT[self.dark_field_mode] * self.num_dark_fields
+                             + _FIELD_MODE_COUNT[self.flat_field_mode] * self.num_flat_fields
+                             + (self.post_scan_mode == 'Yes') * self.num_post_scan)
+        log.debug('total_images=%d', self.total_images)
+        self._pv_fp_num_capture.put(self.total_images, wait=True)
+        self._pv_fp_capture.put('Capture')
            
+    def compute_angles(self, step):
+        """Computes the angles from the ``RotationStart`` PV to the ``RotationEnd`` PV.
+
+        The last angle is the last multiple of step that does not go past ``RotationEnd``.
+        The angles are generated with ``np.linspace`` so that rounding errors in step do
+        not accumulate along the scan.
+
+        Parameters
+        ----------
+        step : float
+            Angular step in degrees.
+
+        Returns
+        -------
+        num_angles : int
+            Number of angles.
+        theta : ndarray
+            The angles in degrees.
+        """
+        # Allow for rounding in the division so that RotationEnd is included when it is on the grid
+        num_angles = max(int(np.floor((self.rotation_stop - self.rotation_start) / step + 1e-6)) + 1, 0)
+        theta = np.linspace(self.rotation_start, self.rotation_start + (num_angles - 1) * step,
+                            num_angles, dtype=np.float64)
+        return num_angles, theta
+
     def end_scan(self):
         """
         Actions to be performed at the end of the scan.
@@ -95,7 +214,21 @@ class TomoScanPrisma(TomoScanSTEP):
         """
         # Call the base class method
         super().end_scan()
-        
+
+    def abort_scan(self):
+        """Performs the operations needed when a scan is aborted.
+
+        This does the following:
+
+        - Calls the base class method.
+
+        - Wakes ``collect_projections()`` if it is waiting for the file plugin to save the projections.
+        """
+
+        # Call the base class method
+        super().abort_scan()
+        self._all_saved.set()
+
 
     def fly_scan(self):
         """Overwrites main method so that we can include a post scan.
@@ -129,6 +262,7 @@ class TomoScanPrisma(TomoScanSTEP):
         free to do so if required.
         """
 
+        rotation_put = self._pv_rotation.put
         try:
             # Prepare for scan
             self.begin_scan()
@@ -138,25 +272,23 @@ class TomoScanPrisma(TomoScanSTEP):
             # Collect the pre-scan flat fields if required
             if (self.num_flat_fields > 0) and (self.flat_field_mode in ('Start', 'Both')):
                 # Move the rotation stage to 0
-                self.epics_pvs['Rotation'].put(0, wait=True)
+                rotation_put(0, wait=True)
                 self.collect_flat_fields()
             # Move the rotation to the start
-            self.epics_pvs['Rotation'].put(self.rotation_start, wait=True)
+            rotation_put(self.rotation_start, wait=True)
             # Collect the projections
-            self.frametype.put('0') # save data in exchange/data
             self.collect_projections()
             # Collect post scan projections
             if (self.num_post_scan > 0) and (self.post_scan_mode=='Yes'):
                 log.info('Collecting post scan')
-                self.frametype.put('3') # save data in exchange/data_post_raw
-                self.num_angles = copy.deepcopy(self.num_post_scan)
-                self.rotation_step = copy.deepcopy(self.post_scan_step) 
-                self.theta = self.rotation_start + np.arange(self.num_angles) * self.rotation_step 
-                self.collect_projections()
+                self.theta = self.theta_post
+                self.num_angles = self.num_post_scan
+                self.rotation_step = self.post_scan_step
+                self.collect_projections(frame_type='3') # save data in exchange/data_post_raw
             # Collect the post-scan flat fields if required
             if (self.num_flat_fields > 0) and (self.flat_field_mode in ('End', 'Both')):
                 # Move the rotation to 0 for flat and dark fields
-                self.epics_pvs['Rotation'].put(0, wait=True)
+                rotation_put(0, wait=True)
                 self.collect_flat_fields()
             # Collect the post-scan dark fields if required
             if (self.num_dark_fields > 0) and (self.dark_field_mode in ('End', 'Both')):
@@ -164,7 +296,6 @@ class TomoScanPrisma(TomoScanSTEP):
 
         except ScanAbortError:
             log.error('Scan aborted')
-            super().ScanAbortError()
         except CameraTimeoutError:
             log.error('Camera timeout')
         except FileOverwriteError:
@@ -178,74 +309,227 @@ class TomoScanPrisma(TomoScanSTEP):
         Collect dark fields.
         """
         log.info("Collecting dark fields")
-        self.control_pvs['CamImageMode'].put('Multiple') # set image mode to multiple
-        self.frametype.put('1') # save data in exchange/data_dark_raw
+        self.set_frame_type('1', 'Multiple') # save data in exchange/data_dark_raw
         super().collect_dark_fields()
     
-    def compute_frame_time(self):
+    def _compute_frame_time_andor(self):
+        """
+        Computes the time to collect and read out an image from an Andor camera.
+
+        Bound to ``compute_frame_time`` in ``__init__`` when the camera is an Andor.
+        """
+        try:
+            readout = _ANDOR_READOUT[self._adc_idx]
+        except (IndexError, TypeError):
+            log.error('Unsupported Andor ADC speed index: %s', self._adc_idx)
+            return 0
+        exposure = self.epics_pvs['CamAcquireTimeRBV'].value
+        frame_time = readout + exposure + 1 #add 1s overhead, found empirically
+        return frame_time
+
+    def _compute_frame_time_teledyne(self):
         """
-        Computes the time to collect and read out an image from the camera.
+        Computes the time to collect and read out an image from a Teledyne DALSA camera.
+
+        Bound to ``compute_frame_time`` in ``__init__`` when the camera is a Teledyne DALSA.
         """
+        return self.exposure_time+0.4
 
-        if (self.manufacturer.find('Andor') != -1):
-            adc = self.control_pvs['CamADCSpeed'].get()
-            if adc == 0:
-                readout = 1/0.953
-            elif adc == 1:
-                readout = 1/0.607
-            elif adc == 2:
-                readout = 1/0.221
-            elif adc == 3:
-                readout = 1/0.011
-            exposure = self.epics_pvs['CamAcquireTimeRBV'].value
-            frame_time = readout + exposure + 1 #add 1s overhead, found empirically
-            return frame_time
-        elif (self.manufacturer.find('Teledyne DALSA') != -1):
-            return self.exposure_time+0.4
-        else:
-            return self.exposure_time*1.3
+    def _compute_frame_time_default(self):
+        """
+        Computes the time to collect and read out an image from any other camera.
+
+        Bound to ``compute_frame_time`` in ``__init__`` when the camera is neither an Andor
+        nor a Teledyne DALSA.
+        """
+        return self.exposure_time*1.3
 
     def collect_flat_fields(self):
         """
         Collect flat fields.
         """
         log.info("Collecting flat fields")
-        self.control_pvs['CamImageMode'].put('Multiple') # set image mode to multiple
-        self.frametype.put('2') # save data in exchange/data_flat_raw
+        self.set_frame_type('2', 'Multiple') # save data in exchange/data_flat_raw
         super().collect_flat_fields()
 
-    def collect_projections(self):
+    def collect_projections(self, frame_type='0'):
         """Collects projections.
 
         This does the following:
 
         - Sets the trigger mode on the camera.
+
+        - Sets the frame type and the image mode on the camera.
    
         - Rotates to desired angle.
 
         - Acquires an image.
 
         - Updates scan status.
+
+        Parameters
+        ----------
+        frame_type : str
+            Value written to the camera ``FrameType`` PV. '0' saves data in exchange/data,
+            '3' saves data in exchange/data_post_raw.
         """
         TomoScan.collect_projections(self)
         self.set_trigger_mode("Internal", self.num_angles) # set the trigger mode
-        self.control_pvs['CamImageMode'].put('Single') # set image mode to single
+        self.set_frame_type(frame_type, 'Single')
         start_time = time.time()
-        stabilization_time = self.epics_pvs['StabilizationTime'].get() # set the stabilization time
+        stabilization_time = self.stabilization_time
         log.info("stabilization time %f s", stabilization_time)
-        for k in range(self.num_angles):
-            if(self.scan_is_running):
-                log.info('angle %d: %f', k, self.theta[k])
-                self.epics_pvs['Rotation'].put(self.theta[k], wait=True) #rotate 
-                time.sleep(stabilization_time)
-                self.epics_pvs['CamAcquire'].put('Acquire',wait=True) # acquire image
-                #self.wait_pv(self.epics_pvs['CamAcquire'], 0, 60) # wait for acquisition PV to finish
-                self.update_status(start_time)
-
-        # wait until the last frame is saved (not needed)
-        time.sleep(0.5)
+        # Bind the objects used on every angle to locals before entering the loop
+        num_angles = self.num_angles
+        # Plain floats avoid converting a numpy scalar on every put
+        theta = np.asarray(self.theta, dtype=np.float64).tolist()
+        ca_put = ca.put
+        flush_io = ca.flush_io
+        acquire_chid = self._acquire_chid
+        acquire_done = self._acquire_done
+        start_rotation = self._start_rotation
+        wait_rotation = self._wait_rotation
+        update_status = self.update_status
+        # Log the angle and update the status for about 100 of the projections rather than for every one
+        log_interval = max(1, num_angles // 100)
+        # Allow for the exposure and readout time of each projection, as collect_static_frames() does
+        frame_timeout = self.compute_frame_time() + 5.0
+        num_collected = 0
+        # Number of frames the file plugin will have saved once all projections are saved.
+        # Drop the previous target before clearing, so that a monitor update for it cannot set the event again
+        self._num_saved_target = None
+        self._all_saved.clear()
+        # Read the count from the IOC, since the monitored value can lag behind the last flat field saved
+        num_saved = self.epics_pvs['FPNumCaptured'].get(use_monitor=False)
+        self._num_saved_target = num_saved + num_angles
+        # The monitor only fires on a later change, so check whether the target is already met
+        if num_saved >= self._num_saved_target:
+            self._all_saved.set()
+        if num_angles > 0:
+            start_rotation(theta[0])
+        for k, angle in enumerate(theta):
+            if not self.scan_is_running:
+                raise ScanAbortError
+            if k % log_interval == 0:
+                log.info('angle %d/%d: %f', k, num_angles, angle)
+            wait_rotation(stabilization_time)
+            acquire_done.clear()
+            ca_put(acquire_chid, 1) # acquire image
+            flush_io()
+            if not acquire_done.wait(frame_timeout): # wait for acquisition to finish
+                raise CameraTimeoutError()
+            num_collected += 1
+            if k+1 < num_angles:
+                # move to the next angle while the status is updated
+                start_rotation(theta[k+1])
+            if k % log_interval == 0:
+                update_status(start_time)
+
+        # wait until the last frame is saved
+        if self.scan_is_running and not self._all_saved.wait(timeout=30):
+            log.warning('file plugin did not save all projections within 30 s')
+        log.info('collected %d projections in %f s', num_collected, time.time() - start_time)
         self.update_status(start_time)    
     
+    def _start_rotation(self, angle):
+        """Starts moving the rotation stage to angle without waiting for the move to complete.
+
+        Use ``_wait_rotation()`` to wait for the move.
+        """
+        # Allow the expected time for the move, including acceleration and deceleration,
+        # the backlash correction and the motor settling delay
+        backlash = abs(self._rotation_backlash)
+        move_time = 2 * self._rotation_accel_time + self._rotation_settle_delay
+        if self._rotation_speed > 0:
+            move_time += (abs(angle - self._pv_rotation.value) + backlash) / self._rotation_speed
+        if backlash > 0:
+            move_time += 2 * self._rotation_backlash_accel_time
+            if self._rotation_backlash_speed > 0:
+                move_time += backlash / self._rotation_backlash_speed
+        self._rotation_timeout = move_time + _ROTATION_TIMEOUT_SLACK
+        self._rotation_target = angle
+        self._rotation_in_deadband = False
+        self._rotation_rbv_time = time.monotonic()
+        self._rotation_move_id += 1
+        self._rotation_done.clear()
+        ca.put(self._rotation_chid, angle, callback=self._rotation_callback,
+               callback_data=self._rotation_move_id)
+        # send the request now rather than at the next CA poll
+        ca.flush_io()
+
+    def _rotation_callback(self, data=None, **kw):
+        """Callback function that is called by pyEpics when a rotation move completes"""
+        if data != self._rotation_move_id:
+            return
+        self._rotation_done_time = time.monotonic()
+        self._rotation_done.set()
+
+    def _rotation_rbv_callback(self, value=None, **kw):
+        """Callback function that is called by pyEpics when the rotation readback changes"""
+        self._rotation_rbv_time = time.monotonic()
+        self._rotation_in_deadband = ((self._rotation_target is not None) and
+                                      (abs(value - self._rotation_target) <= self._rotation_deadband))
+        self._rotation_rbv_changed.set()
+
+    def _acquire_callback(self, value=None, **kw):
+        """Callback function that is called by pyEpics when the camera Acquire PV changes"""
+        if value == 0:
+            self._acquire_done.set()
+
+    def _num_captured_callback(self, value=None, **kw):
+        """Callback function that is called by pyEpics when the file plugin NumCaptured_RBV PV changes"""
+        if (self._num_saved_target is not None) and (value >= self._num_saved_target):
+            self._all_saved.set()
+
+    def _wait_rotation(self, stabilization_time):
+        """Waits for the move started by ``_start_rotation()`` and then for the stage to stabilize.
+
+        The move is given its expected duration, computed from the rotation speed and
+        acceleration time, the backlash correction and the motor settling delay, plus some slack.
+        If the move does not complete in that time the scan is aborted, so that no projection
+        is collected while the stage may still be moving.  The stabilization time is counted from the moment
+        the move completed, so any work done after the move completed is not added to it.
+
+        By default the full stabilization time is always waited.  If the StabilizationSettleTime
+        PV is greater than 0, the wait instead ends once the rotation readback has stayed within
+        the motor retry deadband of the target for that time, with the stabilization time as
+        the maximum.  The readback does not show vibration, and on a stage without an encoder
+        it reaches the target as soon as the move completes, so only enable this where the
+        readback reflects the actual position of the stage.
+
+        Parameters
+        ----------
+        stabilization_time : float
+            Time in seconds to wait after the move has completed.
+
+        Raises
+        ------
+        ScanAbortError
+            If the move does not complete within the expected time
+        """
+        if not self._rotation_done.wait(self._rotation_timeout):
+            log.error('rotation move did not complete in %f s', self._rotation_timeout)
+            self.abort_scan()
+            raise ScanAbortError
+        deadline = self._rotation_done_time + stabilization_time
+        settle_time = self.stabilization_settle_time
+        if settle_time <= 0:
+            time.sleep(max(0, deadline - time.monotonic()))
+            return
+        while True:
+            # Clear before checking so that a readback update during the check wakes the wait
+            self._rotation_rbv_changed.clear()
+            now = time.monotonic()
+            wake_time = deadline
+            if self._rotation_in_deadband:
+                settled_time = self._rotation_rbv_time + settle_time
+                if now >= settled_time:
+                    return
+                wake_time = min(deadline, settled_time)
+            if now >= deadline:
+                return
+            self._rotation_rbv_changed.wait(wake_time - now)
+
     def set_trigger_mode(self, trigger_mode, num_images):
         """Sets the trigger mode on the camera.
 
@@ -259,13 +543,46 @@ class TomoScanPrisma(TomoScanSTEP):
             Number of images to collect.  Ignored if trigger_mode="FreeRun".
             This is used to set the ``NumImages`` PV of the camera.
         """
-        self.epics_pvs['CamAcquire'].put('Done') # stop acquisition
-        self.wait_pv(self.epics_pvs['CamAcquire'], 0) # wait for callback
+        self._acquire_done.clear()
+        self._pv_cam_acquire.put('Done') # stop acquisition
+        if self._pv_cam_acquire.get() != 0:
+            # wait for the monitor to report that acquisition stopped
+            if not self._acquire_done.wait(60):
+                log.error('camera acquisition did not stop within 60 s')
         log.info('set trigger mode: %s', trigger_mode) 
         if trigger_mode=='FreeRun':
-            self.epics_pvs['CamTriggerMode'].put('Internal', wait=True) # set trigger mode
-        else:    
-            self.epics_pvs['CamTriggerMode'].put(trigger_mode, wait=True) # set trigger mode
-        self.wait_pv(self.epics_pvs['CamTriggerMode'], 0) 
-        self.epics_pvs['CamNumImages'].put(num_images, wait=True) # set number of images to take
+            trigger_mode = 'Internal'
+        # set the number of images to take and the trigger mode, if it changed, in one batch
+        pvnames = [self._num_images_pvname]
+        values = [num_images]
+        if self._trigger_mode_current != trigger_mode:
+            pvnames.append(self._trigger_mode_pvname)
+            values.append(trigger_mode)
+        caput_many(pvnames, values, wait='all', put_timeout=5.0)
+        self._trigger_mode_current = trigger_mode
+
+    def set_frame_type(self, frame_type, image_mode):
+        """Sets the frame type and the image mode on the camera.
+
+        Both PVs are written with a single ``caput_many()``.  Each PV is skipped if the
+        camera was already set to that value during the current scan.
 
+        Parameters
+        ----------
+        frame_type : str
+            Value for the camera ``FrameType`` PV, which selects the HDF5 dataset.
+        image_mode : str
+            Choices are: "Single", "Multiple", or "Continuous"
+        """
+        pvnames = []
+        values = []
+        if self._frame_type_current != frame_type:
+            pvnames.append(self._frametype_pvname)
+            values.append(frame_type)
+        if self._image_mode_current != image_mode:
+            pvnames.append(self._image_mode_pvname)
+            values.append(image_mode)
+        if pvnames:
+            caput_many(pvnames, values, wait='all', put_timeout=5.0)
+        self._frame_type_current = frame_type
+        self._image_mode_current = image_mode